@@ -8,19 +8,19 @@ Released under the MIT License.
 
 @author      Erki Suurjaak
 @created     08.05.2020
-@modified    18.04.2023
+@modified    15.10.2026
 ------------------------------------------------------------------------------
 """
 import collections
 from contextlib import contextmanager
-import inspect
+import itertools
 import logging
 import re
 import sys
 import threading
 
 from six.moves import urllib_parse
-from six import binary_type, integer_types, string_types, text_type
+from six import binary_type, integer_types, string_types, text_type, unichr
 
 try:
     import psycopg2
@@ -50,6 +50,38 @@ RESERVED_KEYWORDS = [
     "WHEN", "WHERE", "WINDOW", "WITH"
 ]
 
+## Reserved keywords as set, for membership checks in quote()
+_RESERVED = frozenset(RESERVED_KEYWORDS)
+
+## Regex for identifiers needing quotes: starting with non-letter or containing non-word characters
+_RGX_INVALID = re.compile(r"(^[\W\d])|(?=\W)")
+
+## Regex for identifiers needing Unicode escapes in quotes
+_RGX_UNICODE = re.compile(r"[^\x01-\x7E]")
+
+## Maximum number of rows per multi-row INSERT statement in insertmany()
+_INSERT_PAGE_SIZE = 1000
+
+## Whether psycopg2 supports multi-row INSERT returning inserted IDs, needs version 2.8+
+_INSERT_MULTIROW = bool(psycopg2) and \
+                   tuple(map(int, re.findall(r"\d+", psycopg2.__version__)[:2])) >= (2, 8)
+
+
+class _UEscape(dict):
+    """
+    Translation table for Postgres Unicode-escaped identifiers like U&"\\+0000E4",
+    populated on demand: doubles quotes and backslashes, escapes non-ASCII characters.
+    """
+    def __missing__(self, codepoint):
+        char = unichr(codepoint)
+        result = char * 2 if char in u'"\\' else char if 0x01 <= codepoint <= 0x7E \
+                 else u"\\+%06X" % codepoint
+        self[codepoint] = result
+        return result
+
+## Unicode escape translation table for quote()
+_UESC = _UEscape()
+
 
 class Identifier(object):
     """Wrapper for table and column names from data objects."""
@@ -70,10 +102,10 @@ class Identifier(object):
 class Queryable(api.Queryable):
 
     ## Recognized binary operators for makeSQL()
-    OPS = ("!=", "!~", "!~*", "#", "%", "&", "*", "+", "-", "/", "<", "<<",
-           "<=", "<>", "<@", "=", ">", ">=", ">>", "@>", "^", "|", "||", "&&", "~",
-           "~*", "ANY", "ILIKE", "IN", "IS", "IS NOT", "LIKE", "NOT ILIKE", "NOT IN",
-           "NOT LIKE", "NOT SIMILAR TO", "OR", "OVERLAPS", "SIMILAR TO", "SOME")
+    OPS = frozenset(("!=", "!~", "!~*", "#", "%", "&", "*", "+", "-", "/", "<", "<<",
+                     "<=", "<>", "<@", "=", ">", ">=", ">>", "@>", "^", "|", "||", "&&", "~",
+                     "~*", "ANY", "ILIKE", "IN", "IS", "IS NOT", "LIKE", "NOT ILIKE", "NOT IN",
+                     "NOT LIKE", "NOT SIMILAR TO", "OR", "OVERLAPS", "SIMILAR TO", "SOME"))
 
     ## Name of underlying database engine
     ENGINE = "postgres"
@@ -94,10 +126,17 @@ class Queryable(api.Queryable):
         """
         Convenience wrapper for database multiple INSERTs, returns list of inserted row IDs.
         Keyword arguments are added to VALUES of every single row, overriding individual row values.
+
+        Consecutive rows with the same columns are inserted in multi-row statements
+        of up to 1000 rows, with psycopg2 2.8+. In autocommit mode, a single failing row
+        fails its whole statement, while rows in preceding statements remain inserted.
+        Inserted IDs are matched to rows by position, relying on Postgres returning
+        multi-row INSERT results in VALUES order, which Postgres does not formally guarantee.
         """
-        result = []
+        result, batches = [], []  # [(tuple(col, ), [args for consecutive rows with same cols])]
 
-        sqlcache = {}  # {tuple(col, ): "INSERT .."}
+        sqlcache = {}  # {tuple(col, ): ("INSERT ..", "INSERT .. VALUES %s ..", "(..)", [key, ])}
+        self._load_schema()  # Primary key decides whether inserted IDs are returned
         n = util.nameify(table, self._wrapper(column=False))
         tablename = n.name if isinstance(n, Identifier) else n
         pk = self._structure.get(tablename, {}).get("key")
@@ -116,18 +155,27 @@ class Queryable(api.Queryable):
             cols.sort(key=lambda x: x.lower()), values.sort(key=lambda x: x[0].lower())
             cachekey = tuple(cols)
 
-            sql = sqlcache.get(cachekey)
-            if not sql:
-                sql, args = self.makeSQL("INSERT", tablename, values=values)
-                sqlcache[cachekey] = sql
-            else:
-                keys = ["%sI%s" % (re.sub(r"\W+", "_", k), i) for i, (k, _) in enumerate(values)]
-                args = {a: self._cast(k, v, table, tablename)
-                        for i, (a, (k, v)) in enumerate(zip(keys, values))}
-
-            cursor = self.execute(sql, args)
-            res = None if cursor.description is None else next(cursor, None)
-            result.append(next(iter(res.values())) if res and isinstance(res, dict) else None)
+            if cachekey not in sqlcache:
+                sql, _ = self.makeSQL("INSERT", tablename, values=values)
+                keys = ["%sI%s" % (util.sanitize(k), i) for i, (k, _) in enumerate(values)]
+                sqlmany, template = _make_insert_many(sql, keys) or (None, None)
+                sqlcache[cachekey] = sql, sqlmany, template, keys
+            keys = sqlcache[cachekey][-1]
+            args = {a: self._cast(k, v, table, tablename) for a, (k, v) in zip(keys, values)}
+            if batches and batches[-1][0] == cachekey: batches[-1][1].append(args)
+            else: batches.append((cachekey, [args]))
+
+        idval = lambda x: next(iter(x.values())) if x and isinstance(x, dict) else None
+        for cachekey, argslist in batches:
+            sql, sqlmany, template, _ = sqlcache[cachekey]
+            if len(argslist) > 1 and sqlmany and _INSERT_MULTIROW and self.cursor:  # Rows per page
+                rows = psycopg2.extras.execute_values(self.cursor, sqlmany, argslist, template,
+                                                      _INSERT_PAGE_SIZE, fetch=bool(pk))
+                result.extend(map(idval, rows) if pk else [None] * len(argslist))
+                continue  # for cachekey, argslist
+            for args in argslist:
+                cursor = self.execute(sql, args)
+                result.append(idval(None if cursor.description is None else next(cursor, None)))
         return result
 
 
@@ -135,64 +183,36 @@ class Queryable(api.Queryable):
                 kwargs=None):
         """Returns (SQL statement string, parameter dict)."""
 
-        def parse_members(i, col, op, val):
-            """Returns (col, op, val, argkey)."""
-            if isinstance(col, Identifier): col, colsql, pure = col.name, text_type(col), False
-            elif not isinstance(col, string_types):
-                col = self._match_name(util.nameify(col, parent=table), tablename)
-                colsql, pure = Identifier.quote(col), False
-            else: colsql, pure = col, True
-            key = "%sW%s" % (re.sub(r"\W+", "_", col), i)
-            if "EXPR" == col.upper() and pure:
-                # ("EXPR", ("SQL", val))
-                colsql, op, val, key = val[0], "EXPR", val[1], "EXPRW%s" % i
-            elif col.count("?") == argcount(val) and pure:
-                # ("any SQL with ? placeholders", val)
-                op, val, key = "EXPR", listify(val), "EXPRW%s" % i
-            elif isinstance(val, (list, tuple)) and len(val) == 2 \
-            and isinstance(val[0], string_types):
-                tmp = val[0].strip().upper()
-                if tmp in self.OPS:
-                    # ("col", ("binary op like >=", val))
-                    op, val = tmp, val[1]
-                elif val[0].count("?") == argcount(val[1]):
-                    # ("col", ("SQL with ? placeholders", val))
-                    colsql, val, op = "%s = %s" % (col, val[0]), listify(val[1]), "EXPR"
-            if op in ("IN", "NOT IN") and not val: # IN -> ANY, to avoid error on empty array
-                colsql = "%s%s = ANY('{}')" % ("" if "IN" == op else "NOT ", colsql)
-                op = "EXPR"
-            return colsql, op, self._cast(col, val, table, tablename), key
-        def argcount(x)  : return len(x) if isinstance(x, (list, set, tuple)) else 1
-        def listify(x)   : return x if isinstance(x, (list, tuple)) else \
-                                  list(x) if isinstance(x, set) else [x]
-        def keylistify(x): return x if isinstance(x, (list, tuple)) else \
-                                  list(x) if isinstance(x, (dict, set)) else [x]
-        cast    = lambda col, val:               self._cast(col, val, table, tablename)
-        column  = lambda col, sql=False:         self._column(col, sql, table, tablename)
-        wrapper = lambda column=True, sql=False: self._wrapper(column, sql, tablename)
+        def name(x, namefmt):
+            """Returns value as column name via formatter, cached for the duration of this call."""
+            if (x, namefmt) not in names: names[x, namefmt] = util.nameify(x, namefmt, table)
+            return names[x, namefmt]
+        names = {}  # {(value, formatter): column name}
 
         self._load_schema()
         values0 = values
         action = action.upper()
-        where, group, order, limit, values = (() if x is None else x
-                                              for x in (where, group, order, limit, values))
+        if action not in util.ACTION_TEMPLATES: raise ValueError("Unknown action %r" % action)
+        if where  is None: where  = ()
+        if group  is None: group  = ()
+        if order  is None: order  = ()
+        if limit  is None: limit  = ()
+        if values is None: values = ()
         n = util.nameify(table, self._wrapper(column=False))
         tablename, tablesql = (n.name, text_type(n)) if isinstance(n, Identifier) else (n, n)
-        namefmt  = wrapper(sql=True)
+        namefmt  = self._wrapper(sql=True, tablename=tablename)
 
-        cols   = ", ".join(util.nameify(x, namefmt, table) for x in keylistify(cols)) or "*"
-        group  = ", ".join(util.nameify(x, namefmt, table) for x in keylistify(group))
-        where  = util.keyvalues(where, wrapper())
-        order  = list(order.items()) if isinstance(order, dict) else listify(order)
+        cols   = ", ".join(name(x, namefmt) for x in util.keylistify(cols)) or "*"
+        group  = ", ".join(name(x, namefmt) for x in util.keylistify(group))
+        where  = util.keyvalues(where, self._wrapper(tablename=tablename))
+        order  = list(order.items()) if isinstance(order, dict) else util.listify(order)
         order  = [order] if isinstance(order, (list, tuple)) \
                  and len(order) == 2 and isinstance(order[1], bool) else order
-        limit  = [limit] if isinstance(limit, string_types + integer_types) else limit
-        values = util.keyvalues(values, wrapper())
-        sql    = "SELECT %s FROM %s" % (cols, tablesql) if "SELECT" == action else ""
-        sql    = "DELETE FROM %s"    % (tablesql)       if "DELETE" == action else sql
-        sql    = "INSERT INTO %s"    % (tablesql)       if "INSERT" == action else sql
-        sql    = "UPDATE %s"         % (tablesql)       if "UPDATE" == action else sql
-        args   = {}
+        limit  = [limit] if isinstance(limit, util.LIMIT_TYPES) else limit
+        values = util.keyvalues(values, self._wrapper(tablename=tablename))
+        sql    = util.ACTION_TEMPLATES[action] % ((cols, tablesql) if "SELECT" == action
+                                                  else tablesql)
+        parts, args = [sql], {}
         if kwargs and action in ("SELECT", "DELETE", "UPDATE"): where  += list(kwargs.items())
         if kwargs and action in ("INSERT", ):                   values += list(kwargs.items())
 
@@ -200,21 +220,23 @@ class Queryable(api.Queryable):
             pk = self._structure.get(tablename, {}).get("key")
             if pk and util.is_dataobject(values0):  # Can't avoid giving primary key if data object
                 values = [(k, v) for k, v in values if k != pk or v is not None]  # Discard NULL pk
-            keys = ["%sI%s" % (re.sub(r"\W+", "_", column(k)), i)
-                    for i, (k, _) in enumerate(values)]
-            args.update((a, cast(k, v)) for i, (a, (k, v)) in enumerate(zip(keys, values)))
-            cols = ", ".join(column(k, sql=True) for k, _ in values)
-            vals = ", ".join("%%(%s)s" % s for s in keys)
-            sql += " (%s) VALUES (%s)" % (cols, vals)
-            if pk: sql += " RETURNING %s AS id" % Identifier.quote(pk)
+            cols, vals = [], []
+            for i, (col, val) in enumerate(values):
+                key = "%sI%s" % (util.sanitize(self._column(col, False, table, tablename)), i)
+                cols.append(self._column(col, True, table, tablename))
+                vals.append("%%(%s)s" % key)
+                args[key] = self._cast(col, val, table, tablename)
+            parts.append(" (%s) VALUES (%s)" % (", ".join(cols), ", ".join(vals)))
+            if pk: parts.append(" RETURNING %s AS id" % Identifier.quote(pk))
         if "UPDATE" == action:
-            sql += " SET "
+            sets = []
             for i, (col, val) in enumerate(values):
-                key = "%sU%s" % (re.sub(r"\W+", "_", column(col)), i)
-                sql += (", " if i else "") + "%s = %%(%s)s" % (column(col, sql=True), key)
-                args[key] = cast(col, val)
+                key = "%sU%s" % (util.sanitize(self._column(col, False, table, tablename)), i)
+                sets.append("%s = %%(%s)s" % (self._column(col, True, table, tablename), key))
+                args[key] = self._cast(col, val, table, tablename)
+            parts.extend((" SET ", ", ".join(sets)))
         if where:
-            sql += " WHERE "
+            exprs = []
             for i, clause in enumerate(where):
                 if isinstance(clause, string_types): # "raw SQL with no arguments"
                     clause = (clause, )
@@ -222,42 +244,85 @@ class Queryable(api.Queryable):
                 if len(clause) == 1: # ("raw SQL with no arguments", )
                     col, op, val, key = clause[0], "EXPR", [], None
                 elif len(clause) == 2: # ("col", val) or ("col", ("op" or "expr with ?", val))
-                    col, op, val, key = parse_members(i, clause[0], "=", clause[1])
+                    col, val = clause
+                    if not isinstance(col, string_types) or "?" in col \
+                    or isinstance(val, (list, set, tuple)) \
+                    or len(col) == 4 and "EXPR" == col.upper():
+                        col, op, val, key = self._parse_members(i, col, "=", val, table, tablename)
+                    else:  # ("col", scalar)
+                        op, key = "=", "%sW%s" % (util.sanitize(col), i)
+                        val = self._cast(col, val, table, tablename)
                 else: # ("col", "op" or "expr with ?", val)
-                    col, op, val, key = parse_members(i, *clause)
+                    col, op, val, key = self._parse_members(i, *clause, table=table,
+                                                            tablename=tablename)
 
                 if "EXPR" == op:
-                    for j in range(col.count("?")):
-                        col = col.replace("?", "%%(%s_%s)s" % (key, j), 1)
-                        args["%s_%s" % (key, j)] = cast(None, val[j])
-                    sql += (" AND " if i else "") + "(%s)" % col
+                    def repl(match, key=key, val=val, counter=itertools.count()):
+                        """Returns parameter placeholder for next "?", adds argument value."""
+                        j = next(counter)
+                        argkey = "%s_%s" % (key, j)
+                        args[argkey] = self._cast(None, val[j], table, tablename)
+                        return "%%(%s)s" % argkey
+                    exprs.append("(%s)" % util.RGX_ARG.sub(repl, col))
                 elif val is None:
-                    op = {"=": "IS", "!=": "IS NOT", "<>": "IS NOT"}.get(op, op)
-                    sql += (" AND " if i else "") + "%s %s NULL" % (col, op)
+                    op = util.NULL_OPS.get(op, op)
+                    exprs.append("%s %s NULL" % (col, op))
                 else:
                     args[key] = val
-                    sql += (" AND " if i else "") + "%s %s %%(%s)s" % (col, op, key)
+                    exprs.append("%s %s %%(%s)s" % (col, op, key))
+            parts.extend((" WHERE ", " AND ".join(exprs)))
         if group:
-            sql += " GROUP BY " + group
+            parts.extend((" GROUP BY ", group))
         if order:
-            sql += " ORDER BY "
-            for i, col in enumerate(order):
-                name = util.nameify(col[0] if isinstance(col, (list, tuple)) else col, quote, table)
-                sort = col[1] if name != col and isinstance(col, (list, tuple)) and len(col) > 1 \
+            sorts = []
+            for col in order:
+                colsql = name(col[0] if isinstance(col, (list, tuple)) else col, quote)
+                sort = col[1] if colsql != col and isinstance(col, (list, tuple)) and len(col) > 1 \
                        else ""
                 if not isinstance(sort, string_types): sort = "" if sort else "DESC"
-                sql += (", " if i else "") + name + (" " if sort else "") + sort
+                sorts.append("%s %s" % (colsql, sort) if sort else colsql)
+            parts.extend((" ORDER BY ", ", ".join(sorts)))
         if limit:
             limit = [None if isinstance(v, integer_types) and v < 0 else v for v in limit]
             for k, v in zip(("limit", "offset"), limit):
                 if v is None: continue  # for k, v
-                sql += " %s %%(%s)s" % (k.upper(), k)
+                parts.append(" %s %%(%s)s" % (k.upper(), k))
                 args[k] = v
 
+        sql = "".join(parts)
         logger.log(logging.DEBUG // 2, sql)
         return sql, args
 
 
+    def _parse_members(self, i, col, op, val, table, tablename):
+        """Returns (col, op, val, argkey) for WHERE clause."""
+        if isinstance(col, Identifier): col, colsql, pure = col.name, text_type(col), False
+        elif not isinstance(col, string_types):
+            col = self._match_name(util.nameify(col, parent=table), tablename)
+            colsql, pure = Identifier.quote(col), False
+        else: colsql, pure = col, True
+        key = "%sW%s" % (util.sanitize(col), i)
+        if pure and len(col) == 4 and "EXPR" == col.upper():
+            # ("EXPR", ("SQL", val))
+            colsql, op, val, key = val[0], "EXPR", val[1], "EXPRW%s" % i
+        elif col.count("?") == util.argcount(val) and pure:
+            # ("any SQL with ? placeholders", val)
+            op, val, key = "EXPR", util.listify(val), "EXPRW%s" % i
+        elif isinstance(val, (list, tuple)) and len(val) == 2 \
+        and isinstance(val[0], string_types):
+            tmp = val[0].strip().upper()
+            if tmp in self.OPS:
+                # ("col", ("binary op like >=", val))
+                op, val = tmp, val[1]
+            elif val[0].count("?") == util.argcount(val[1]):
+                # ("col", ("SQL with ? placeholders", val))
+                colsql, val, op = "%s = %s" % (col, val[0]), util.listify(val[1]), "EXPR"
+        if op in ("IN", "NOT IN") and not val: # IN -> ANY, to avoid error on empty array
+            colsql = "%s%s = ANY('{}')" % ("" if "IN" == op else "NOT ", colsql)
+            op = "EXPR"
+        return colsql, op, self._cast(col, val, table, tablename), key
+
+
     @classmethod
     def quote(cls, value, force=False):
         """
@@ -286,7 +351,8 @@ class Queryable(api.Queryable):
         col = col.name if isinstance(col, Identifier) else \
               col if isinstance(col, string_types) else \
               self._match_name(util.nameify(col, parent=table), tablename)
-        field = tablename in self._structure and self._structure[tablename]["fields"].get(col)
+        struct = self._structure.get(tablename)
+        field = struct and struct["fields"].get(col)
         if field and "array" == field["type"]:  # Values for array fields must be lists
             return list(val) if isinstance(val, (list, set, tuple)) else [val]
         elif field and val is not None:
@@ -298,7 +364,7 @@ class Queryable(api.Queryable):
 
     def _column(self, col, sql=False, table=None, tablename=None):
         """Returns column name from string/property/Identifier, quoted if object and `sql`."""
-        if inspect.isdatadescriptor(col):
+        if util.is_descriptor_type(type(col)):
             col = util.nameify(col, self._wrapper(sql=sql, tablename=tablename), table)
         if isinstance(col, Identifier): return text_type(col) if sql else col.name
         return col if isinstance(col, string_types) else text_type(col)
@@ -354,9 +420,6 @@ class Database(api.Database, Queryable):
     ## Registered converters for SQL->Python pending application, as {typename: converter}
     CONVERTERS = {}
 
-    ## Mutexes for exclusive transactions, as {Database instance: lock}
-    MUTEX = collections.defaultdict(threading.RLock)
-
     ## Connection pool default size per Database
     POOL_SIZE = (1, 4)
 
@@ -387,7 +450,8 @@ class Database(api.Database, Queryable):
         self._kwargs      = kwargs
         self._cursor      = None
         self._cursorctx   = None
-        self._txs         = []    # [Transaction, ]
+        self._txs         = collections.OrderedDict()  # {id(Transaction): Transaction}
+        self._mutex       = threading.RLock()  # Lock for exclusive transactions
         self._row_factory = None  # None if default, False if explicitly default, or func(cur, row)
         self._structure   = None  # Database schema as {table or view name: {"fields": {..}, ..}}
 
@@ -400,7 +464,8 @@ class Database(api.Database, Queryable):
 
     def __exit__(self, exc_type, exc_val, exc_trace):
         """Context manager exit, closes database and any pending transactions if open."""
-        txs, self._txs[:] = self._txs[:], []
+        txs = list(self._txs.values())
+        self._txs.clear()
         for tx in txs: tx.close(commit=None if exc_type is None else False)
         self.close()
         return exc_type is None
@@ -461,13 +526,13 @@ class Database(api.Database, Queryable):
                          `False` for explicit rollback on open transactions,
                          `None` defaults to `commit` flag from transaction creations
         """
-        txs, self._txs[:] = self._txs[:], []
+        txs = list(self._txs.values())
+        self._txs.clear()
         for tx in txs: tx.close(commit)
         if self._cursor:
             self._cursorctx.__exit__(None, None, None)
             self._cursor = None
         self._cursorctx = None
-        self.MUTEX.pop(self, None)
         pool = self.POOLS.pop(self, None)
         if pool: pool.closeall()
 
@@ -514,7 +579,7 @@ class Database(api.Database, Queryable):
         @param   kwargs     engine-specific arguments, like `schema="other", lazy=True` for Postgres
         """
         tx = Transaction(self, commit, exclusive, **kwargs)
-        self._txs.append(tx)
+        self._txs[id(tx)] = tx
         return tx
 
 
@@ -568,7 +633,7 @@ class Database(api.Database, Queryable):
     @classmethod
     def init_pool(cls, db, minconn=POOL_SIZE[0], maxconn=POOL_SIZE[1], **kwargs):
         """Initializes connection pool for Database if not already initialized."""
-        with cls.MUTEX[db]:
+        with db._mutex:
             if db in cls.POOLS: return
 
             args = minconn, maxconn, db.dsn
@@ -599,7 +664,7 @@ class Database(api.Database, Queryable):
 
     def _notify(self, tx):
         """Notifies database of transaction closing."""
-        if tx in self._txs: self._txs.remove(tx)
+        self._txs.pop(id(tx), None)
 
 
 
@@ -643,13 +708,13 @@ class Transaction(api.Transaction, Queryable):
         """Context manager entry, opens cursor, returns Transaction object."""
         if self.closed: raise RuntimeError("Transaction already closed")
 
-        if self._exclusive: Database.MUTEX[self._db].acquire()
+        if self._exclusive: self._db._mutex.acquire()
         try:
             if not self._cursor: self._cursor = self._cursorctx.__enter__()
             self._enterstack += 1
             return self
         except Exception:
-            if self._exclusive: Database.MUTEX[self._db].release()
+            if self._exclusive: self._db._mutex.release()
             raise
 
     def __exit__(self, exc_type, exc_val, exc_trace):
@@ -666,7 +731,7 @@ class Transaction(api.Transaction, Queryable):
                 self._cursor = None
                 self._cursorctx = None
                 self._db._notify(self)
-            if self._exclusive: Database.MUTEX[self._db].release()
+            if self._exclusive: self._db._mutex.release()
 
     def close(self, commit=None):
         """
@@ -920,17 +985,32 @@ def quote(value, force=False):
     """
     if not isinstance(value, string_types):
         return value
-    RGX_INVALID, RGX_UNICODE = r"(^[\W\d])|(?=\W)", r"[^\x01-\x7E]"
     result = value.decode() if isinstance(value, binary_type) else value
-    if force or result.upper() in RESERVED_KEYWORDS or re.search(RGX_INVALID, result):
-        if re.search(RGX_UNICODE, value):  # Convert to Unicode escape U&"\+ABCDEF"
-            result = result.replace("\\", r"\\").replace('"', '""')
-            result = 'U&"%s"' % re.sub(RGX_UNICODE, lambda m: r"\+%06X" % ord(m.group(0)), value)
+    return _quote_cached(result, bool(force))
+
+
+@util.memoize(maxsize=4096)
+def _quote_cached(value, force):
+    """Returns text identifier quoted if required or forced, cached for repeated names."""
+    result = value
+    if force or result.upper() in _RESERVED or _RGX_INVALID.search(result):
+        if _RGX_UNICODE.search(value):  # Convert to Unicode escape U&"\+ABCDEF"
+            result = 'U&"%s"' % result.translate(_UESC)
         else:
             result = '"%s"' % result.replace('"', '""')
     return result
 
 
+def _make_insert_many(sql, keys):
+    """
+    Returns ("INSERT .. VALUES %s ..", "(%(key)s, ..)") for psycopg2 execute_values(),
+    from single-row INSERT statement with given parameter keys, or None if not applicable.
+    """
+    template = "(%s)" % ", ".join("%%(%s)s" % k for k in keys)
+    if sql.count(" VALUES %s" % template) != 1: return None
+    return sql.replace(" VALUES %s" % template, " VALUES %s", 1), template
+
+
 def register_adapter(transformer, typeclasses):
     """Registers function to auto-adapt given Python types to Postgres types in query parameters."""
     def adapt(x):
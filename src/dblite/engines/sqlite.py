@@ -8,11 +8,11 @@ Released under the MIT License.
 
 @author      Erki Suurjaak
 @created     05.03.2014
-@modified    26.03.2023
+@modified    15.10.2026
 ------------------------------------------------------------------------------
 """
 import collections
-import inspect
+import itertools
 import logging
 import os
 import re
@@ -22,6 +22,10 @@ import threading
 
 from six import binary_type, integer_types, string_types, text_type
 
+try:
+    import pathlib
+except ImportError: pathlib = None  # Py2
+
 from .. import api, util
 
 logger = logging.getLogger(__name__)
@@ -43,13 +47,26 @@ RESERVED_KEYWORDS = [
     "UNIQUE", "UPDATE", "USING", "VACUUM", "VALUES", "VIEW", "WHEN", "WHERE", "WITHOUT"
 ]
 
+## Reserved keywords as set, for membership checks in quote()
+_RESERVED = frozenset(RESERVED_KEYWORDS)
+
+## Regex for identifiers needing quotes: starting with non-letter or containing non-word characters
+_RGX_INVALID = re.compile(r"(^[\W\d])|(?=\W)", re.U)
+
+## Keyword arguments supported by sqlite3.connect()
+_CONNECT_KWS = frozenset(("timeout", "detect_types", "isolation_level", "check_same_thread",
+                          "factory", "cached_statements", "uri"))
+
+## Regex for URL scheme prefix like "postgresql://", in connection options of other engines
+_RGX_SCHEME = re.compile(r"^\w+://")
+
 
 class Queryable(api.Queryable):
 
     ## Recognized binary operators for makeSQL()
-    OPS = ["||", "*", "/", "%", "+", "-", "<<", ">>", "&", "|", "<", "<=", ">",
-           ">=", "=", "==", "!=", "<>", "IS", "IS NOT", "IN", "NOT IN", "LIKE",
-           "GLOB", "MATCH", "REGEXP", "AND", "OR"]
+    OPS = frozenset(["||", "*", "/", "%", "+", "-", "<<", ">>", "&", "|", "<", "<=", ">",
+                     ">=", "=", "==", "!=", "<>", "IS", "IS NOT", "IN", "NOT IN", "LIKE",
+                     "GLOB", "MATCH", "REGEXP", "AND", "OR"])
 
     ## Name of underlying database engine
     ENGINE = "sqlite"
@@ -60,7 +77,8 @@ class Queryable(api.Queryable):
         Convenience wrapper for database INSERT, returns inserted row ID.
         Keyword arguments are added to VALUES.
         """
-        sql, args = self.makeSQL("INSERT", table, values=values, kwargs=kwargs)
+        sql, args = self._make_insert(table, values, kwargs) or \
+                    self.makeSQL("INSERT", table, values=values, kwargs=kwargs)
         return self.execute(sql, args).lastrowid
 
 
@@ -71,7 +89,7 @@ class Queryable(api.Queryable):
         """
 
         result = []
-        sqlcache = {}  # {tuple(col, ): "INSERT .."}
+        sqlcache = {}  # {tuple(col, ): ("INSERT ..", [parameter key, ])}
         commons = {util.nameify(k, parent=table): v for k, v in kwargs.items()}
         for row in rows:
             cols, values, valueidx = [], [], {}
@@ -84,13 +102,12 @@ class Queryable(api.Queryable):
             cols.sort(key=lambda x: x.lower()), values.sort(key=lambda x: x[0].lower())
             cachekey = tuple(cols)
 
-            sql = sqlcache.get(cachekey)
-            if not sql:
-                sql, args = self.makeSQL("INSERT", table, values=values)
-                sqlcache[cachekey] = sql
-            else:
-                keys = ["%sI%s" % (re.sub(r"\W+", "_", k), i) for i, (k, _) in enumerate(values)]
-                args = {n: self._cast(k, v) for n, (k, v) in zip(keys, values)}
+            if cachekey not in sqlcache:
+                sql, _ = self.makeSQL("INSERT", table, values=values)
+                keys = ["%sI%s" % (util.sanitize(k), i) for i, (k, _) in enumerate(values)]
+                sqlcache[cachekey] = sql, keys
+            sql, keys = sqlcache[cachekey]
+            args = {n: self._cast(k, v) for n, (k, v) in zip(keys, values)}
             result.append(self.execute(sql, args).lastrowid)
         return result
 
@@ -98,69 +115,65 @@ class Queryable(api.Queryable):
     def makeSQL(self, action, table, cols="*", where=(), group=(), order=(), limit=(), values=(),
                 kwargs=None):
         """Returns (SQL statement string, parameter dict)."""
+        if action.upper() in ("SELECT", "DELETE"):  # Simple equality WHERE needs no generic parsing
+            args = (table, cols, where) if "SELECT" == action.upper() else (table, where)
+            maker = self._make_select if "SELECT" == action.upper() else self._make_delete
+            result = maker(*args + (group, order, limit, kwargs))
+            if result: return result
 
-        def parse_members(i, col, op, val):
-            """Returns (col, op, val, argkey)."""
-            col = util.nameify(col, quote, table)
-            key = "%sW%s" % (re.sub(r"\W+", "_", col), i)
-            if "EXPR" == col.upper():
-                # ("EXPR", ("SQL", val))
-                col, op, val, key = val[0], "EXPR", val[1], "EXPRW%s" % i
-            elif col.count("?") == argcount(val):
-                # ("any SQL with ? placeholders", val)
-                op, val, key = "EXPR", listify(val), "EXPRW%s" % i
-            elif isinstance(val, (list, tuple)) and len(val) == 2 \
-            and isinstance(val[0], string_types):
-                tmp = val[0].strip().upper()
-                if tmp in self.OPS:
-                    # ("col", ("binary op like >=", val))
-                    op, val = tmp, val[1]
-                elif val[0].count("?") == argcount(val[1]):
-                    # ("col", ("SQL with ? placeholders", val))
-                    col, val, op = "%s = %s" % (col, val[0]), listify(val[1]), "EXPR"
-            return col, op, val, key
-        def argcount(x)  : return len(x) if isinstance(x, (list, set, tuple)) else 1
-        def listify(x)   : return x if isinstance(x, (list, tuple)) else \
-                                  list(x) if isinstance(x, set) else [x]
-        def keylistify(x): return x if isinstance(x, (list, tuple)) else \
-                                  list(x) if isinstance(x, (dict, set)) else [x]
+        sql, args = self._make_sql(action, table, cols, where, group, order, limit, values, kwargs)
+        logger.log(logging.DEBUG // 2, sql)
+        return sql, args
+
+
+    def _make_sql(self, action, table, cols="*", where=(), group=(), order=(), limit=(), values=(),
+                  kwargs=None):
+        """Returns (SQL statement string, parameter dict), via generic argument parsing."""
+
+        def name(x):
+            """Returns value as quoted column name, cached for the duration of this call."""
+            if x not in names: names[x] = util.nameify(x, quote, table)
+            return names[x]
+        names = {}  # {value: column name}
 
         action = action.upper()
-        where, group, order, limit, values = (() if x is None else x
-                                              for x in (where, group, order, limit, values))
+        if action not in util.ACTION_TEMPLATES: raise ValueError("Unknown action %r" % action)
+        if where  is None: where  = ()
+        if group  is None: group  = ()
+        if order  is None: order  = ()
+        if limit  is None: limit  = ()
+        if values is None: values = ()
         tablesql = util.nameify(table, quote)
-        cols   = ", ".join(util.nameify(x, quote, table) for x in keylistify(cols)) or "*"
-        group  = ", ".join(util.nameify(x, quote, table) for x in keylistify(group))
+        cols   = ", ".join(name(x) for x in util.keylistify(cols)) or "*"
+        group  = ", ".join(name(x) for x in util.keylistify(group))
         where  = util.keyvalues(where, quote)
-        order  = list(order.items()) if isinstance(order, dict) else listify(order)
+        order  = list(order.items()) if isinstance(order, dict) else util.listify(order)
         order  = [order] if isinstance(order, (list, tuple)) \
                  and len(order) == 2 and isinstance(order[1], bool) else order
-        limit  = [limit] if isinstance(limit, string_types + integer_types) else limit
+        limit  = [limit] if isinstance(limit, util.LIMIT_TYPES) else limit
         values = util.keyvalues(values, quote)
-        sql    = "SELECT %s FROM %s" % (cols, tablesql) if "SELECT" == action else ""
-        sql    = "DELETE FROM %s"    % (tablesql)       if "DELETE" == action else sql
-        sql    = "INSERT INTO %s"    % (tablesql)       if "INSERT" == action else sql
-        sql    = "UPDATE %s"         % (tablesql)       if "UPDATE" == action else sql
-        args   = {}
+        sql    = util.ACTION_TEMPLATES[action] % ((cols, tablesql) if "SELECT" == action
+                                                  else tablesql)
+        parts, args = [sql], {}
         if kwargs and action in ("SELECT", "DELETE", "UPDATE"): where  += list(kwargs.items())
         if kwargs and action in ("INSERT", ):                   values += list(kwargs.items())
 
         if "INSERT" == action:
-            keys = ["%sI%s" % (re.sub(r"\W+", "_", self._column(k, table=table)), i)
-                    for i, (k, _) in enumerate(values)]
-            args.update((n, self._cast(k, v)) for n, (k, v) in zip(keys, values))
-            cols = ", ".join(self._column(k, sql=True, table=table) for k, _ in values)
-            vals = ", ".join(":%s" % n for n in keys)
-            sql += " (%s) VALUES (%s)" % (cols, vals)
+            cols, vals = [], []
+            for i, (col, val) in enumerate(values):
+                key = "%sI%s" % (util.sanitize(self._column(col, table=table)), i)
+                cols.append(self._column(col, sql=True, table=table)), vals.append(":" + key)
+                args[key] = self._cast(col, val)
+            parts.append(" (%s) VALUES (%s)" % (", ".join(cols), ", ".join(vals)))
         if "UPDATE" == action:
-            sql += " SET "
+            sets = []
             for i, (col, val) in enumerate(values):
-                key = "%sU%s" % (re.sub(r"\W+", "_", self._column(col, table=table)), i)
-                sql += (", " if i else "") + \
-                       "%s = :%s" % (self._column(col, sql=True, table=table), key)
+                key = "%sU%s" % (util.sanitize(self._column(col, table=table)), i)
+                sets.append("%s = :%s" % (self._column(col, sql=True, table=table), key))
                 args[key] = self._cast(col, val)
+            parts.extend((" SET ", ", ".join(sets)))
         if where:
-            sql += " WHERE "
+            exprs = []
             for i, clause in enumerate(where):
                 if isinstance(clause, string_types): # "raw SQL with no arguments"
                     clause = (clause, )
@@ -168,47 +181,149 @@ class Queryable(api.Queryable):
                 if len(clause) == 1: # ("raw SQL with no arguments", )
                     col, op, val, key = clause[0], "EXPR", [], None
                 elif len(clause) == 2: # ("col", val) or ("col", ("op" or "expr with ?", val))
-                    col, op, val, key = parse_members(i, clause[0], "=", clause[1])
+                    col, val = name(clause[0]), clause[1]
+                    if "?" in col or isinstance(val, (list, set, tuple)) \
+                    or len(col) == 4 and "EXPR" == col.upper():
+                        col, op, val, key = self._parse_members(i, col, "=", val)
+                    else: op, key = "=", "%sW%s" % (util.sanitize(col), i)  # ("col", scalar)
                 else: # ("col", "op" or "expr with ?", val)
-                    col, op, val, key = parse_members(i, *clause)
+                    col, op, val, key = self._parse_members(i, name(clause[0]), *clause[1:])
 
                 if op in ("IN", "NOT IN"):
-                    keys = ["%s_%s" % (key, j) for j in range(len(val))]
-                    args.update({k: self._cast(col, v) for k, v in zip(keys, val)})
-                    sql += (" AND " if i else "") + "%s %s (%s)" % (
-                            col, op, ", ".join(":" + x for x in keys))
+                    marks = []
+                    for j, v in enumerate(val):
+                        argkey = "%s_%s" % (key, j)
+                        args[argkey] = self._cast(col, v)
+                        marks.append(":" + argkey)
+                    exprs.append("%s %s (%s)" % (col, op, ", ".join(marks)))
                 elif "EXPR" == op:
-                    for j in range(col.count("?")):
-                        col = col.replace("?", ":%s_%s" % (key, j), 1)
-                        args["%s_%s" % (key, j)] = self._cast(None, val[j])
-                    sql += (" AND " if i else "") + "(%s)" % col
+                    def repl(match, key=key, val=val, counter=itertools.count()):
+                        """Returns parameter placeholder for next "?", adds argument value."""
+                        j = next(counter)
+                        argkey = "%s_%s" % (key, j)
+                        args[argkey] = self._cast(None, val[j])
+                        return ":" + argkey
+                    exprs.append("(%s)" % util.RGX_ARG.sub(repl, col))
                 elif val is None:
-                    op = {"=": "IS", "!=": "IS NOT", "<>": "IS NOT"}.get(op, op)
-                    sql += (" AND " if i else "") + "%s %s NULL" % (col, op)
+                    op = util.NULL_OPS.get(op, op)
+                    exprs.append("%s %s NULL" % (col, op))
                 else:
                     args[key] = self._cast(col, val)
-                    sql += (" AND " if i else "") + "%s %s :%s" % (col, op, key)
+                    exprs.append("%s %s :%s" % (col, op, key))
+            parts.extend((" WHERE ", " AND ".join(exprs)))
         if group:
-            sql += " GROUP BY " + group
+            parts.extend((" GROUP BY ", group))
         if order:
-            sql += " ORDER BY "
-            for i, col in enumerate(order):
-                name = util.nameify(col[0] if isinstance(col, (list, tuple)) else col, quote, table)
-                sort = col[1] if name != col and isinstance(col, (list, tuple)) and len(col) > 1 \
+            sorts = []
+            for col in order:
+                colsql = name(col[0] if isinstance(col, (list, tuple)) else col)
+                sort = col[1] if colsql != col and isinstance(col, (list, tuple)) and len(col) > 1 \
                        else ""
                 if not isinstance(sort, string_types): sort = "" if sort else "DESC"
-                sql += (", " if i else "") + name + (" " if sort else "") + sort
+                sorts.append("%s %s" % (colsql, sort) if sort else colsql)
+            parts.extend((" ORDER BY ", ", ".join(sorts)))
         if limit:
             limit = [None if isinstance(v, integer_types) and v < 0 else v for v in limit]
             for i, (k, v) in enumerate(zip(("limit", "offset"), limit)):
                 if v is None:
                     if i or len(limit) < 2 or not limit[1]: continue  # for i, (k, v)
                     v = -1  # LIMIT is required if OFFSET
-                sql += " %s :%s" % (k.upper(), k)
+                parts.append(" %s :%s" % (k.upper(), k))
                 args[k] = v
 
+        return "".join(parts), args
+
+
+    def _make_insert(self, table, values, kwargs):
+        """
+        Returns (SQL statement string, parameter dict) for INSERT into table given by name,
+        with values as a dict or a sequence of pairs with column names, bypassing makeSQL(),
+        or None if not applicable.
+        """
+        if not isinstance(table, string_types): return None
+        if type(values) in (dict, collections.OrderedDict): items = values.items()
+        elif type(values) in (list, tuple) \
+        and all(type(x) in (list, tuple) and len(x) == 2 for x in values): items = values
+        else: return None
+        if kwargs: items = list(items) + list(kwargs.items())  # Copy only if merging
+        if not all(isinstance(k, string_types) for k, _ in items): return None
+        sql, keys = _make_insert_sql(table, tuple(k for k, _ in items))
         logger.log(logging.DEBUG // 2, sql)
-        return sql, args
+        return sql, {n: self._cast(k, v) for n, (k, v) in zip(keys, items)}
+
+
+    def _parse_members(self, i, col, op, val):
+        """Returns (col, op, val, argkey) for WHERE clause, column given as resolved name."""
+        key = "%sW%s" % (util.sanitize(col), i)
+        if len(col) == 4 and "EXPR" == col.upper():
+            # ("EXPR", ("SQL", val))
+            col, op, val, key = val[0], "EXPR", val[1], "EXPRW%s" % i
+        elif col.count("?") == util.argcount(val):
+            # ("any SQL with ? placeholders", val)
+            op, val, key = "EXPR", util.listify(val), "EXPRW%s" % i
+        elif isinstance(val, (list, tuple)) and len(val) == 2 \
+        and isinstance(val[0], string_types):
+            tmp = val[0].strip().upper()
+            if tmp in self.OPS:
+                # ("col", ("binary op like >=", val))
+                op, val = tmp, val[1]
+            elif val[0].count("?") == util.argcount(val[1]):
+                # ("col", ("SQL with ? placeholders", val))
+                col, val, op = "%s = %s" % (col, val[0]), util.listify(val[1]), "EXPR"
+        return col, op, val, key
+
+
+    def _make_select(self, table, cols, where, group, order, limit, kwargs):
+        """
+        Returns (SQL statement string, parameter dict) for SELECT from table given by name,
+        with WHERE as a dict of column names and non-NULL scalar values, and no GROUP BY,
+        ORDER BY or LIMIT, bypassing makeSQL(), or None if not applicable.
+        """
+        if isinstance(cols, string_types): cols = (cols, )
+        elif type(cols) not in (list, tuple) \
+        or not all(isinstance(x, string_types) for x in cols): return None
+        items = self._parse_simple_where(table, where, group, order, limit, kwargs)
+        if items is None: return None
+
+        sql, keys = _make_select_sql(table, tuple(cols), tuple(k for k, _ in items))
+        logger.log(logging.DEBUG // 2, sql)
+        return sql, {n: self._cast(k, v) for n, (k, v) in zip(keys, items)}
+
+
+    def _make_delete(self, table, where, group, order, limit, kwargs):
+        """
+        Returns (SQL statement string, parameter dict) for DELETE from table given by name,
+        with WHERE as a dict of column names and non-NULL scalar values, and no GROUP BY,
+        ORDER BY or LIMIT, bypassing makeSQL(), or None if not applicable.
+        """
+        items = self._parse_simple_where(table, where, group, order, limit, kwargs)
+        if items is None: return None
+
+        sql, keys = _make_delete_sql(table, tuple(k for k, _ in items))
+        logger.log(logging.DEBUG // 2, sql)
+        return sql, {n: self._cast(k, v) for n, (k, v) in zip(keys, items)}
+
+
+    def _parse_simple_where(self, table, where, group, order, limit, kwargs):
+        """
+        Returns WHERE and keyword arguments as [(column name, value)] for table given by name,
+        if all are plain column names with non-NULL scalar values and there is no GROUP BY,
+        ORDER BY or LIMIT, else None.
+        """
+        if not isinstance(table, string_types) \
+        or any(x is not None and (x or type(x) not in (list, tuple, dict))
+               for x in (group, order, limit)): return None
+
+        if where is None: items = []
+        elif type(where) in (dict, collections.OrderedDict): items = list(where.items())
+        elif type(where) in (list, tuple) and not where: items = []
+        else: return None
+        items.extend((kwargs or {}).items())
+        if not all(isinstance(k, string_types) and "?" not in k
+                   and (len(k) != 4 or "EXPR" != k.upper())
+                   and v is not None and not isinstance(v, (list, set, tuple))
+                   for k, v in items): return None
+        return items
 
 
     @classmethod
@@ -230,7 +345,8 @@ class Queryable(api.Queryable):
 
     def _column(self, col, sql=False, table=None):
         """Returns column name from string/property, quoted if object and `sql`."""
-        if inspect.isdatadescriptor(col): col = util.nameify(col, quote if sql else None, table)
+        if util.is_descriptor_type(type(col)):
+            col = util.nameify(col, quote if sql else None, table)
         return col if isinstance(col, string_types) else text_type(col)
 
 
@@ -242,8 +358,8 @@ class Database(api.Database, Queryable):
     Queries directly on the Database object use autocommit mode.
     """
 
-    ## Mutexes for exclusive actions, as {Database instance: lock}
-    MUTEX = collections.defaultdict(threading.RLock)
+    ## Default PRAGMA settings for file databases, executed on opening connection, as {name: value}
+    PRAGMAS = {}
 
     ## Registered row factory
     ROW_FACTORY = None
@@ -255,17 +371,34 @@ class Database(api.Database, Queryable):
 
         @param   opts    file path or `":memory:"`
         @param   kwargs  supported arguments are passed to sqlite3.connect() in open(),
-                         like `detect_types=sqlite3.PARSE_COLNAMES`
+                         like `detect_types=sqlite3.PARSE_COLNAMES`;
+                         `pragmas` can give PRAGMA settings to execute on opening connection,
+                         as `{name: value}` overriding defaults, with `None` value to skip
+                         a default, or `pragmas=None` to skip all defaults
         """
         super(Database, self).__init__()
         self.connection   = None
         self.path         = opts
         self._kwargs      = kwargs
         self._isolevel    = None  # Connection isolation level, None is auto-commit
+        self._has_intx    = False # Whether connection has in_transaction attribute
+        self._path_ready  = False # Whether database directory has been ensured on open
         rowtype = dict if sys.version_info > (3, ) else collections.OrderedDict
-        self._def_factory = lambda cursor, row: rowtype(sqlite3.Row(cursor, row))
+        lastcols = [(None, None)]  # [(last cursor.description, [column name, ])]
+        def def_factory(cursor, row):
+            """Returns row as dictionary, with column names taken once per statement."""
+            description, names = lastcols[0]
+            if cursor.description is not description:
+                description = cursor.description
+                names = [x[0] for x in description]
+                lastcols[0] = description, names
+            result = rowtype(zip(names, row))
+            # Duplicate column names: retain first value, as sqlite3.Row does
+            return result if len(result) == len(row) else rowtype(sqlite3.Row(cursor, row))
+        self._def_factory = def_factory
         self._row_factory = None  # None if default, False if explicitly default, or func(cur, row)
-        self._txs         = []    # [Transaction, ]
+        self._txs         = collections.OrderedDict()  # {id(Transaction): Transaction}
+        self._mutex       = threading.RLock()  # Lock for exclusive transactions
 
 
     def __enter__(self):
@@ -276,8 +409,11 @@ class Database(api.Database, Queryable):
 
     def __exit__(self, exc_type, exc_val, exc_trace):
         """Context manager exit, closes database and any pending transactions if open."""
-        txs, self._txs[:] = self._txs[:], []
-        for tx in txs: tx.close(commit=None if exc_type is None else False)
+        txs = list(self._txs.values())
+        self._txs.clear()
+        if txs:
+            with self._mutex:  # Close all under one lock acquisition
+                for tx in txs: tx._close_unlocked(commit=None if exc_type is None else False)
         self.close()
         return exc_type is None
 
@@ -313,22 +449,43 @@ class Database(api.Database, Queryable):
         self.connection.executescript(sql)
 
 
+    def insertmany(self, table, rows=(), **kwargs):
+        """
+        Convenience wrapper for database multiple INSERTs, returns list of inserted row IDs.
+        Keyword arguments are added to VALUES of every single row, overriding individual row values.
+
+        Rows are inserted in a single transaction, instead of committing after each row,
+        unless a transaction is already ongoing on the connection.
+        """
+        if self._txs or self._has_intx and self.connection.in_transaction:
+            return Queryable.insertmany(self, table, rows, **kwargs)
+        with self.transaction() as tx:
+            return tx.insertmany(table, rows, **kwargs)
+
+
     def open(self):
-        """Opens the database connection, if not already open."""
+        """
+        Opens the database connection, if not already open.
+
+        File databases get default PRAGMAS on opening, if any, overridden by `pragmas` argument.
+        """
         if self.connection: return
-        KWS = ("timeout", "detect_types", "isolation_level", "check_same_thread",
-               "factory", "cached_statements", "uri")
-        args = dict(detect_types=sqlite3.PARSE_DECLTYPES,
+        args = dict(detect_types=sqlite3.PARSE_DECLTYPES, cached_statements=1024,
                     isolation_level=None, check_same_thread=False)
-        args.update({k: v for k, v in self._kwargs.items() if k in KWS})
-        if ":memory:" != self.path and not os.path.exists(self.path):
+        for k, v in self._kwargs.items():
+            if k in _CONNECT_KWS: args[k] = v
+        if not self._path_ready and ":memory:" != self.path and not os.path.exists(self.path) \
+        and os.path.dirname(self.path):
             try: os.makedirs(os.path.dirname(self.path))
             except Exception: pass
         self.connection = sqlite3.connect(self.path, **args)
+        self._path_ready = True
         self._isolevel = self.connection.isolation_level
+        self._has_intx = hasattr(self.connection, "in_transaction")  # Py 3.2+
         row_factory = self.ROW_FACTORY if self._row_factory is None else self._row_factory
         if row_factory in (False, None): row_factory = self._def_factory
         self.connection.row_factory = row_factory
+        self._apply_pragmas()
 
 
     def close(self, commit=None):
@@ -339,8 +496,11 @@ class Database(api.Database, Queryable):
                          `False` for explicit rollback on open transactions,
                          `None` defaults to `commit` flag from transaction creations
         """
-        txs, self._txs[:] = self._txs[:], []
-        for tx in txs: tx.close(commit)
+        txs = list(self._txs.values())
+        self._txs.clear()
+        if txs:
+            with self._mutex:  # Close all under one lock acquisition
+                for tx in txs: tx._close_unlocked(commit)
         if self.connection:
             self.connection.close()
             self.connection = None
@@ -388,13 +548,26 @@ class Database(api.Database, Queryable):
         @param   kwargs     engine-specific arguments, like `detect_types=sqlite3.PARSE_COLNAMES`
         """
         tx = Transaction(self, commit, exclusive, **kwargs)
-        self._txs.append(tx)
+        self._txs[id(tx)] = tx
         return tx
 
 
+    def _apply_pragmas(self):
+        """Executes PRAGMA settings from defaults and `pragmas` argument, if any."""
+        pragmas = self._kwargs.get("pragmas", {})
+        defaults = {} if pragmas is None or ":memory:" == self.path else self.PRAGMAS
+        for name, value in dict(defaults, **pragmas or {}).items():
+            if value is None: continue  # for name, value
+            try: self.connection.execute("PRAGMA %s = %s" % (name, value))
+            except sqlite3.Error:
+                if name in pragmas: raise
+                logger.warning("Failed to set PRAGMA %s = %s on %s.", name, value, self.path,
+                               exc_info=True)  # E.g. read-only database
+
+
     def _notify(self, tx):
         """Notifies database of transaction closing."""
-        if tx in self._txs: self._txs.remove(tx)
+        self._txs.pop(id(tx), None)
         if not self._txs and self.connection: self.connection.isolation_level = self._isolevel
 
 
@@ -428,10 +601,10 @@ class Transaction(api.Transaction, Queryable):
         """Context manager entry, opens cursor, returns Transaction object."""
         if self._closed: raise RuntimeError("Transaction already closed")
 
-        if self._exclusive: Database.MUTEX[self._db].acquire()
+        if self._exclusive: self._db._mutex.acquire()
         try: not self._cursor and self._make_cursor()
         except Exception:
-            if self._exclusive: Database.MUTEX[self._db].release()
+            if self._exclusive: self._db._mutex.release()
             raise
         self._enterstack += 1
         return self
@@ -448,7 +621,7 @@ class Transaction(api.Transaction, Queryable):
                 self._cursor = None
                 self._closed = True
                 self._db._notify(self)
-            if self._exclusive: Database.MUTEX[self._db].release()
+            if self._exclusive: self._db._mutex.release()
 
     def close(self, commit=None):
         """
@@ -457,14 +630,9 @@ class Transaction(api.Transaction, Queryable):
         @param   commit  `True` for final commit, `False` for rollback,
                          `None` for auto-commit, if any
         """
-        if self._closed:
-            self._db._notify(self)
-            return
-        if commit is False or not commit and not self._exitcommit: self.rollback()
-        elif commit or self._exitcommit: self.commit()
-        self._cursor = None
-        self._closed = True
-        self._db._notify(self)
+        if self._cursor:
+            with self._db._mutex: return self._close_unlocked(commit)
+        self._close_unlocked(commit)
 
     def execute(self, sql, args=()):
         """
@@ -499,20 +667,20 @@ class Transaction(api.Transaction, Queryable):
         @param   sql   script with one or more SQL statements
         """
         if self._closed: raise RuntimeError("Transaction already closed")
-        with Database.MUTEX[self._db]:
+        with self._db._mutex:
             self._reset(commit=True)
             self._db.executescript(sql)
 
     def commit(self):
         """Commits pending actions, if any."""
         if not self._cursor: return
-        with Database.MUTEX[self._db]:
+        with self._db._mutex:
             self._reset(commit=True)
 
     def rollback(self):
         """Rolls back pending actions, if any."""
         if not self._cursor: return
-        with Database.MUTEX[self._db]:
+        with self._db._mutex:
             self._reset(commit=False)
 
     @property
@@ -533,6 +701,14 @@ class Transaction(api.Transaction, Queryable):
         """Returns transaction Database instance."""
         return self._db
 
+    def _close_unlocked(self, commit=None):
+        """Closes the transaction like close(), requires caller to hold database lock."""
+        if not self._closed and self._cursor:
+            self._reset(commit=commit is not False and bool(commit or self._exitcommit))
+        self._cursor = None
+        self._closed = True
+        self._db._notify(self)
+
     def _make_cursor(self):
         """Opens the transaction cursor."""
         self._db.connection.isolation_level = "DEFERRED"
@@ -543,8 +719,9 @@ class Transaction(api.Transaction, Queryable):
 
     def _reset(self, commit=False):
         """Commits or rolls back ongoing transaction, if any, closes cursor, if any."""
-        if getattr(self._db.connection, "in_transaction", True):  # Py 3.2+
-            self._db.connection.commit() if commit else self._db.connection.rollback()
+        conn = self._db.connection
+        if not self._db._has_intx or conn.in_transaction:
+            (conn.commit if commit else conn.rollback)()
         if self._cursor:
             self._cursor.close()
             self._cursor = None
@@ -558,9 +735,8 @@ def autodetect(opts):
     @param   opts    expected as a path string or path-like object
     """
     if isinstance(opts, string_types):  # E.g. not "postgresql://"
-        return opts.startswith("file:") or not re.match(r"^\w+\:\/\/", opts)
-    elif sys.version_info >= (3, 4):
-        import pathlib
+        return opts.startswith("file:") or not _RGX_SCHEME.match(opts)
+    elif pathlib:
         return isinstance(opts, pathlib.Path)
     return False
 
@@ -575,11 +751,43 @@ def quote(value, force=False):
     """
     if not isinstance(value, string_types):
         return value
-    RGX_INVALID = r"(^[\W\d])|(?=\W)"
     result = value.decode() if isinstance(value, binary_type) else value
-    if force or result.upper() in RESERVED_KEYWORDS or re.search(RGX_INVALID, result, re.U):
-        result = u'"%s"' % result.replace('"', '""')
-    return result
+    return _quote_cached(result, bool(force))
+
+
+@util.memoize(maxsize=4096)
+def _quote_cached(value, force):
+    """Returns text identifier quoted if required or forced, cached for repeated names."""
+    if force or value.upper() in _RESERVED or _RGX_INVALID.search(value):
+        value = u'"%s"' % value.replace('"', '""')
+    return value
+
+
+@util.memoize(maxsize=256)
+def _make_delete_sql(table, wheres):
+    """Returns ("DELETE FROM table WHERE ..", [parameter key, ]) for column names."""
+    keys = ["%sW%s" % (util.sanitize(c), i) for i, c in enumerate(wheres)]
+    sql = "DELETE FROM %s" % table
+    if wheres: sql += " WHERE " + " AND ".join("%s = :%s" % x for x in zip(wheres, keys))
+    return sql, keys
+
+
+@util.memoize(maxsize=256)
+def _make_select_sql(table, cols, wheres):
+    """Returns ("SELECT .. FROM table WHERE ..", [parameter key, ]) for column names."""
+    keys = ["%sW%s" % (util.sanitize(c), i) for i, c in enumerate(wheres)]
+    sql = "SELECT %s FROM %s" % (", ".join(cols) or "*", table)
+    if wheres: sql += " WHERE " + " AND ".join("%s = :%s" % x for x in zip(wheres, keys))
+    return sql, keys
+
+
+@util.memoize(maxsize=256)
+def _make_insert_sql(table, cols):
+    """Returns ("INSERT INTO table (..) VALUES (..)", [parameter key, ]) for column names."""
+    keys = ["%sI%s" % (util.sanitize(c), i) for i, c in enumerate(cols)]
+    sql = "INSERT INTO %s (%s) VALUES (%s)" % (table, ", ".join(cols),
+                                                ", ".join(":%s" % k for k in keys))
+    return sql, keys
 
 
 def register_adapter(transformer, typeclasses):
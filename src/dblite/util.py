@@ -8,12 +8,13 @@ Released under the MIT License.
 
 @author      Erki Suurjaak
 @created     28.11.2022
-@modified    19.07.2023
+@modified    15.10.2026
 ------------------------------------------------------------------------------
 """
 import collections
 import datetime
 import decimal
+import functools
 import glob
 import importlib
 import inspect
@@ -46,6 +47,26 @@ class StaticTzInfo(datetime.tzinfo):
 ## UTC timezone singleton
 UTC = StaticTzInfo("UTC", StaticTzInfo.ZERO)
 
+## SQL statement heads for makeSQL() actions, as {action: template with table and columns}
+ACTION_TEMPLATES = {"SELECT": "SELECT %s FROM %s", "DELETE": "DELETE FROM %s",
+                    "INSERT": "INSERT INTO %s",    "UPDATE": "UPDATE %s"}
+
+## Types of single LIMIT value in makeSQL(), as (type, )
+LIMIT_TYPES = six.string_types + six.integer_types
+
+## Operators replaced for NULL values in WHERE, as {operator: NULL comparison operator}
+NULL_OPS = {"=": "IS", "!=": "IS NOT", "<>": "IS NOT"}
+
+## Regex for positional "?" placeholders in SQL expressions given in WHERE
+RGX_ARG = re.compile(r"\?")
+
+## Regex for non-word characters in column names, replaced in query parameter keys
+_RGX_KEY = re.compile(r"\W+")
+
+
+def argcount(x):
+    """Returns number of query arguments in value: length if collection else 1."""
+    return len(x) if isinstance(x, (list, set, tuple)) else 1
 
 
 def factory(ctor, data):
@@ -138,6 +159,11 @@ def json_loads(s):
         return s
 
 
+def keylistify(x):
+    """Returns value as list or tuple, converting dict keys and sets, wrapping other values."""
+    return x if isinstance(x, (list, tuple)) else list(x) if isinstance(x, (dict, set)) else [x]
+
+
 def keyvalues(obj, namefmt=None):
     """
     Returns a list of keys and values, or [given object] if not applicable.
@@ -170,6 +196,11 @@ def keyvalues(obj, namefmt=None):
     return [obj]
 
 
+def listify(x):
+    """Returns value as list or tuple, converting sets and wrapping other values."""
+    return x if isinstance(x, (list, tuple)) else list(x) if isinstance(x, set) else [x]
+
+
 def load_modules():
     """Returns db engines loaded from file directory, as {name: module}."""
     result = {}
@@ -185,6 +216,35 @@ def load_modules():
     return result
 
 
+def memoize(maxsize=128):
+    """
+    Returns function decorator caching results by positional arguments.
+
+    Uses functools.lru_cache in Py3, and a plain dictionary in Py2
+    that gets cleared when reaching maximum size.
+
+    @param   maxsize  maximum number of results to keep in cache
+    """
+    if hasattr(functools, "lru_cache"): return functools.lru_cache(maxsize=maxsize)  # Py3
+    def decorator(func):
+        cache = {}
+        @functools.wraps(func)
+        def inner(*args):
+            if args in cache: return cache[args]
+            if len(cache) >= maxsize: cache.clear()
+            result = cache[args] = func(*args)
+            return result
+        inner.cache_clear = cache.clear
+        return inner
+    return decorator
+
+
+@memoize(maxsize=256)
+def is_descriptor_type(cls):
+    """Returns whether class is a data descriptor type, like property or __slots__ member."""
+    return hasattr(cls, "__set__") or hasattr(cls, "__delete__")
+
+
 def nameify(val, namefmt=None, parent=None):
     """
     Returns value as table or column name string.
@@ -237,8 +297,15 @@ def parse_datetime(s):
     return result
 
 
+@memoize(maxsize=2048)
+def sanitize(name):
+    """Returns column name with non-word characters replaced, for use in query parameter keys."""
+    return _RGX_KEY.sub("_", name)
+
+
 __all__ = [
-    "StaticTzInfo", "UTC",
-    "factory", "is_dataobject", "is_namedtuple", "json_dumps", "json_loads",
-    "keyvalues", "load_modules", "nameify", "parse_datetime",
+    "StaticTzInfo", "UTC", "ACTION_TEMPLATES", "LIMIT_TYPES", "NULL_OPS", "RGX_ARG",
+    "argcount", "factory", "is_dataobject", "is_descriptor_type", "is_namedtuple",
+    "json_dumps", "json_loads", "keylistify", "keyvalues", "listify", "load_modules", "memoize",
+    "nameify", "parse_datetime", "sanitize",
 ]
@@ -13,7 +13,7 @@ Released under the MIT License.
 
 @author      Erki Suurjaak
 @created     20.11.2022
-@modified    27.03.2023
+@modified    15.10.2026
 ------------------------------------------------------------------------------
 """
 import collections
@@ -565,6 +565,15 @@ class TestAPI(unittest.TestCase):
                     self.assertNotEqual(result, value,
                                         "Unexpected value from %s.quote(%r, force=True): %r." %
                                         (label(tx), value, result))
+            QUOTEDS = {  # {engine: [(name, expected quoted name)]}
+                "postgres": [(u'ä"b', u'U&"\\+0000E4""b"'), (u"ä\\b", u'U&"\\+0000E4\\\\b"'),
+                             (u'a"b', u'"a""b"'),             (u"ä b",  u'U&"\\+0000E4 b"')],
+                "sqlite":   [(u'ä"b', u'"ä""b"'),             (u'a"b',  u'"a""b"')],
+            }
+            for value, expected in QUOTEDS.get(tx.ENGINE, []):
+                logger.debug("Verifying Transaction.quote(%r).", value)
+                self.assertEqual(tx.quote(value), expected,
+                                 "Unexpected value from %s.quote(%r)." % (label(tx), value))
 
 
     def verify_exclusive_transactions(self):
@@ -11,7 +11,7 @@ Released under the MIT License.
 
 @author      Erki Suurjaak
 @created     22.11.2022
-@modified    27.03.2023
+@modified    15.10.2026
 ------------------------------------------------------------------------------
 """
 import collections
@@ -32,6 +32,11 @@ class TestPostgres(unittest.TestCase):
     TABLES = {
         "test": [{"name": "id",  "type": "INTEGER PRIMARY KEY"},
                  {"name": "val", "type": "TEXT"}],
+        "test_serial": [{"name": "id", "type": "SERIAL PRIMARY KEY"},
+                        {"name": "a",  "type": "TEXT"},
+                        {"name": "b",  "type": "TEXT"}],
+        "test_nokey":  [{"name": "a",  "type": "TEXT"},
+                        {"name": "b",  "type": "TEXT"}],
     }
 
     ## Table test data, as {table name: [{row}]}
@@ -77,6 +82,19 @@ class TestPostgres(unittest.TestCase):
         except ImportError:
             logger.warning("Skip testing postgres, psycopg2 not available.")
             return
+
+        logger.info("Verifying multi-row INSERT statement for insertmany().")
+        db = dblite.engines.postgres.Database(self._env)
+        for structure in ({}, {"test": {"key": "id", "fields": {}}}):
+            db._structure = structure  # Avoid loading schema from database
+            sql, _ = db.makeSQL("INSERT", "test", values=[("id", 1), ("my val", "val1")])
+            sqlmany, template = dblite.engines.postgres._make_insert_many(sql, ["idI0", "my_valI1"])
+            self.assertEqual(sqlmany.count(" VALUES %s"), 1, "Unexpected value from "
+                             "_make_insert_many(%r): %r." % (sql, sqlmany))
+            self.assertEqual(sqlmany.replace(" VALUES %s", " VALUES " + template), sql,
+                             "Unexpected value from _make_insert_many(%r)." % sql)
+            self.assertEqual("RETURNING" in sqlmany, bool(structure),
+                             "Unexpected value from _make_insert_many(%r): %r." % (sql, sqlmany))
         try:
             dblite.init({})
         except psycopg2.Error as e:
@@ -133,6 +151,27 @@ class TestPostgres(unittest.TestCase):
                 self.assertEqual(rows, datas, "Unexpected value from tx.select().")
                 tx.executescript("DROP TABLE %s" % table)
 
+        logger.info("Verifying postgres.Database.insertmany().")
+        for table in ("test_serial", "test_nokey"):  # Database-level to reload database schema
+            dblite.executescript("DROP TABLE IF EXISTS %s" % table)
+            dblite.executescript("CREATE TABLE %s (%s)" % (table,
+                                 ", ".join("%(name)s %(type)s" % c for c in self.TABLES[table])))
+        rows = [{"a": "1"}, {"a": "2"}, {"b": "3"}, {"a": "4", "b": "4"}, {"b": "5", "a": "5"},
+                {"a": "6"}, {"b": "7"}, {"b": "8"}]  # Alternating column sets in batches
+        rows += [{"a": str(i), "b": str(i)} for i in range(len(rows) + 1, 2501)]  # Many pages
+        for table, expected_ids in [("test_serial", list(range(1, len(rows) + 1))),
+                                    ("test_nokey",  [None] * len(rows))]:
+            logger.debug("Verifying insertmany() into %s.", table)
+            ids = dblite.insertmany(table, rows)
+            self.assertEqual(ids, expected_ids, "Unexpected value from db.insertmany().")
+            order = "id" if expected_ids[0] else ()
+            expected = [dict({"a": None, "b": None}, **x) for x in rows]
+            received = [{"a": x["a"], "b": x["b"]} for x in dblite.fetchall(table, order=order)]
+            if not order:  # Table without key has no defined order
+                sortkey = lambda x: (x["a"] or "", x["b"] or "")
+                expected, received = sorted(expected, key=sortkey), sorted(received, key=sortkey)
+            self.assertEqual(received, expected, "Unexpected value from db.select().")
+
 
 
 if "__main__" == __name__:
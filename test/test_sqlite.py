@@ -9,7 +9,7 @@ Released under the MIT License.
 
 @author      Erki Suurjaak
 @created     22.11.2022
-@modified    27.03.2023
+@modified    15.10.2026
 ------------------------------------------------------------------------------
 """
 import datetime
@@ -125,6 +125,72 @@ class TestSQLite(unittest.TestCase):
         for db in dbs:
             db.close()
 
+        logger.info("Verifying insertmany() within ongoing transaction.")
+        db = dblite.init(self._paths[1])
+        rows = [{"id": 1, "val": "val1"}, {"id": 2, "val": "val2"}, {"id": 3, "val": "val3"}]
+        for table in self.TABLES: db.delete(table)
+        with db.transaction(exclusive=False) as tx:
+            tx.insert(table, rows[0])
+            db.insertmany(table, rows[1:])
+            tx.rollback()
+        self.assertEqual(db.fetchall(table), [], "Unexpected value from db.select() after "
+                         "rolling back transaction with nested db.insertmany().")
+
+        logger.info("Verifying insertmany() rolling back all rows on failing row.")
+        with self.assertRaises(sqlite3.IntegrityError):
+            db.insertmany(table, rows + rows[:1])
+        self.assertEqual(db.fetchall(table), [], "Unexpected value from db.select() after "
+                         "failed db.insertmany().")
+        self.assertEqual(db.insertmany(table, rows), [1, 2, 3],
+                         "Unexpected value from db.insertmany().")
+        db.close()
+
+        logger.info("Verifying simple SELECT and DELETE shortcuts matching generic makeSQL().")
+        class CastingDatabase(dblite.engines.sqlite.Database):
+            def _cast(self, col, val):
+                """Returns string values prefixed with column name."""
+                return "%s:%s" % (col, val) if isinstance(val, str) else val
+        for cls in (dblite.engines.sqlite.Database, CastingDatabase):
+            db = cls(self._paths[1])
+            for cols, where, kwargs in [
+                ("*", None, {}), (["id", "val"], {"val": "val1"}, {}),
+                ("val", {"id": 1}, {"val": "val1"}), ("*", (), {"id": 2}),
+            ]:
+                args = ("test", cols, where, None, None, None)
+                self.assertEqual(db._make_select(*args + (kwargs, )),
+                                 db._make_sql("SELECT", *args + ((), kwargs)),
+                                 "Unexpected value from %s._make_select()." % cls.__name__)
+                self.assertEqual(db._make_delete(*args[:1] + args[2:] + (kwargs, )),
+                                 db._make_sql("DELETE", *args + ((), kwargs)),
+                                 "Unexpected value from %s._make_delete()." % cls.__name__)
+            db.close()
+
+        logger.info("Verifying pragmas parameter.")
+        def pragma(db, name):  # Returns current PRAGMA value from database
+            return list(db.execute("PRAGMA %s" % name).fetchone().values())[0]
+        TEMP_DEFAULT, TEMP_FILE, TEMP_MEMORY = 0, 1, 2  # PRAGMA temp_store values
+        MEMORY = {"temp_store": "MEMORY"}
+        for defaults, path, kwargs, expected in [
+            ({},     self._paths[0], {},                                  TEMP_DEFAULT),
+            ({},     self._paths[0], {"pragmas": {"temp_store": "FILE"}}, TEMP_FILE),
+            (MEMORY, self._paths[0], {},                                  TEMP_MEMORY),
+            (MEMORY, self._paths[0], {"pragmas": {"temp_store": "FILE"}}, TEMP_FILE),
+            (MEMORY, self._paths[0], {"pragmas": {"temp_store": None}},   TEMP_DEFAULT),
+            (MEMORY, self._paths[0], {"pragmas": None},                   TEMP_DEFAULT),
+            (MEMORY, ":memory:",     {},                                  TEMP_DEFAULT),
+        ]:
+            dblite.engines.sqlite.Database.PRAGMAS = defaults
+            try: db = dblite.init(path, **kwargs)
+            finally: dblite.engines.sqlite.Database.PRAGMAS = {}
+            self.assertEqual(pragma(db, "temp_store"), expected, "Unexpected PRAGMA temp_store "
+                             "for %r %s with defaults %s." % (path, kwargs, defaults))
+            self.assertEqual(pragma(db, "journal_mode"), "memory" if ":memory:" == path else
+                             "delete", "Unexpected PRAGMA journal_mode for %r %s." % (path, kwargs))
+            db.close()
+        db = dblite.init(self._paths[0], pragmas={"journal_mode": "WAL", "cache_size": -1000})
+        self.assertEqual(pragma(db, "journal_mode"), "wal", "Unexpected PRAGMA journal_mode.")
+        self.assertEqual(pragma(db, "cache_size"), -1000, "Unexpected PRAGMA cache_size.")
+        db.close()
 
 
 if "__main__" == __name__:
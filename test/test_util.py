@@ -9,7 +9,7 @@ Released under the MIT License.
 
 @author      Erki Suurjaak
 @created     19.07.2023
-@modified    20.07.2023
+@modified    15.10.2026
 ------------------------------------------------------------------------------
 """
 import collections
@@ -137,6 +137,19 @@ class TestUtil(unittest.TestCase):
             self.assertEqual(received2, expected2, ERR(FUNC2, received1))
 
 
+    def test_keylistify(self):
+        """Tests util.keylistify()."""
+        DATAS = [  # [(input, expected), ]
+            ("a",        ["a"]),
+            (1,          [1]),
+            (["a", "b"], ["a", "b"]),
+            (("a", "b"), ("a", "b")),
+            (set("a"),   ["a"]),
+            ({"a": 1},   ["a"]),
+        ]
+        self.verify_function(dblite.util.keylistify, DATAS)
+
+
     def test_keyvalues(self):
         """Tests util.keyvalues()."""
         namefmt = lambda x: x.upper()
@@ -157,6 +170,19 @@ class TestUtil(unittest.TestCase):
         self.verify_function(dblite.util.keyvalues, DATAS)
 
 
+    def test_listify(self):
+        """Tests util.listify()."""
+        DATAS = [  # [(input, expected), ]
+            ("a",        ["a"]),
+            (None,       [None]),
+            (["a", "b"], ["a", "b"]),
+            (("a", "b"), ("a", "b")),
+            (set("a"),   ["a"]),
+            ({"a": 1},   [{"a": 1}]),
+        ]
+        self.verify_function(dblite.util.listify, DATAS)
+
+
     def test_load_modules(self):
         """Tests util.load_modules()."""
         FUNC = dblite.util.load_modules
@@ -168,6 +194,21 @@ class TestUtil(unittest.TestCase):
             self.assertIsInstance(v, types.ModuleType, ERR(FUNC))
 
 
+    def test_memoize(self):
+        """Tests util.memoize()."""
+        FUNC = dblite.util.memoize
+        logger.info("Verifying %s.", NAME(FUNC))
+        calls = []
+        def func(*args): return calls.append(args) or len(calls)
+        cached = FUNC(maxsize=2)(func)
+        for args, expected in [(("a", ), 1), (("a", ), 1), (("b", 1), 2), (("a", ), 1)]:
+            self.assertEqual(cached(*args), expected, ERR(FUNC))
+        self.assertEqual(calls, [("a", ), ("b", 1)], ERR(FUNC))
+        for args in [("c", ), ("d", ), ("e", )]: cached(*args)
+        cached("a")
+        self.assertEqual(calls[-1], ("a", ), "Expected eviction from %s." % NAME(FUNC))
+
+
     def test_nameify(self):
         """Tests util.nameify()."""
         namefmt = lambda x: x.upper()
@@ -216,6 +257,16 @@ class TestUtil(unittest.TestCase):
                                  ERR(FUNC, arg))
 
 
+    def test_sanitize(self):
+        """Tests util.sanitize()."""
+        DATAS = [  # [(input, expected), ]
+            ("id",         "id"),
+            ("my col",     "my_col"),
+            ("a.b-c..d",   "a_b_c_d"),
+        ]
+        self.verify_function(dblite.util.sanitize, DATAS)
+
+
     def verify_function(self, func, entries):
         """
         Tests given function with given pairs of (argument, expected).